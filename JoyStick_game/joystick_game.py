@@ -1,5 +1,7 @@
 import pygame
 import serial
+import threading
+import time
 
 pygame.init()
 
@@ -16,7 +18,46 @@ character_speed = 5
 
 # Serial communication setup
 arduino_port = 'COM5'  # Replace with your Arduino port
-ser = serial.Serial(arduino_port, 9600)
+ser = serial.Serial(arduino_port, 9600, timeout=0.05)
+
+
+class SerialThread(threading.Thread):
+    """Reads joystick lines in the background so the game loop never blocks on serial."""
+
+    def __init__(self, ser):
+        super().__init__(daemon=True)
+        self.ser = ser
+        self.running = True
+        self.lock = threading.Lock()
+        self.latest = None  # newest (joy_x, joy_y, button_state) not yet used
+
+    def take(self):
+        """Return the newest sample since the last call, or None."""
+        with self.lock:
+            sample, self.latest = self.latest, None
+        return sample
+
+    def run(self):
+        while self.running:
+            try:
+                line = self.ser.readline().decode().strip()
+                if line:  # make sure it's not empty
+                    data = line.split(',')
+                    if len(data) == 3:
+                        try:
+                            sample = tuple(int(d) for d in data)
+                        except ValueError:
+                            continue
+                        with self.lock:
+                            self.latest = sample
+            except Exception as e:
+                print("Error reading serial:", e)
+                time.sleep(0.2)
+
+
+reader = SerialThread(ser)
+reader.start()
+clock = pygame.time.Clock()
 
 running = True
 
@@ -28,51 +69,32 @@ while running:
         if event.type == pygame.QUIT:
             running = False
 
-    try:
-        line = ser.readline().decode().strip()
-        if line:  # make sure it's not empty
-            data = line.split(',')
-            if len(data) == 3 and all(d.isdigit() for d in data):
-                joy_x, joy_y, button_state = map(int, data)
-                print(f"X: {joy_x}, Y: {joy_y}, Button: {button_state}")
-
-                # Calculate new character position based on joystick input
-                new_x = character_x + (joy_x - 512) // 100 * character_speed
-                new_y = character_y + (joy_y - 512) // 100 * character_speed
-
-                # Boundaries
-                new_x = max(character_size // 2, min(win_width - character_size // 2, new_x))
-                new_y = max(character_size // 2, min(win_height - character_size // 2, new_y))
-
-                if (new_x, new_y) != (prev_x, prev_y):
-                    character_x, character_y = new_x, new_y
-
-                # Change color on button
-                character_color = (0, 0, 255) if button_state == 0 else (255, 0, 0)
-
-    except Exception as e:
-        print("Error reading serial:", e)
-
+    sample = reader.take()
+    if sample:
+        joy_x, joy_y, button_state = sample
+        print(f"X: {joy_x}, Y: {joy_y}, Button: {button_state}")
 
         # Calculate new character position based on joystick input
         new_x = character_x + (joy_x - 512) // 100 * character_speed
         new_y = character_y + (joy_y - 512) // 100 * character_speed
 
-        # Ensure the character stays within the screen boundaries
+        # Boundaries
         new_x = max(character_size // 2, min(win_width - character_size // 2, new_x))
         new_y = max(character_size // 2, min(win_height - character_size // 2, new_y))
 
-        # Update character position only if it has moved
         if (new_x, new_y) != (prev_x, prev_y):
             character_x, character_y = new_x, new_y
 
-        # Change character color based on buttonState
-        character_color = (0, 0, 255) if button_state == 1 else (106,13,173)
+        # Change color on button
+        character_color = (0, 0, 255) if button_state == 0 else (255, 0, 0)
 
     win.fill((255, 255, 255))
     pygame.draw.circle(win, character_color, (character_x, character_y), character_size // 2)
     pygame.display.flip()
+    clock.tick(60)
 
 # Clean up
+reader.running = False
+reader.join(timeout=0.5)
 ser.close()
 pygame.quit()
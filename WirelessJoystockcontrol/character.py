@@ -5,7 +5,8 @@ real_game_3d.py
 - Uses pygame for display and pyserial to read from Bluetooth serial
 
 Install requirements:
-  pip install pygame pyserial
+  pip install pygame pyserial numpy
+  pip install numba   (optional, JIT-compiles the 3D math)
 
 To find your Bluetooth COM port on Windows:
   1. Pair your HC-05/HC-06 Bluetooth module in Windows settings
@@ -14,12 +15,16 @@ To find your Bluetooth COM port on Windows:
   4. Set SERIAL_PORT below to that port, or leave as None for auto-detect
 """
 
-import pygame, sys, math, time, threading, queue, json
+import pygame, sys, os, re, math, time, threading, json
+import numpy as np
+from collections import OrderedDict
+from dataclasses import dataclass
 from pygame.math import Vector3, Vector2
 
 # ---------- Configuration ----------
 SCREEN_W, SCREEN_H = 1280, 720
-FPS = 60
+FPS = 60  # frame cap, kept even with vsync since SDL may silently ignore it
+UPDATE_HZ = 120  # simulation rate of the background update thread
 
 # IMPORTANT: Set this to your Bluetooth COM port!
 # Windows: "COM5", "COM7", etc. (check Device Manager)
@@ -39,6 +44,9 @@ ROT_SPEED = 160.0       # degrees per second
 SENSITIVITY_ROT = 0.25  # joystick X->rotation multiplier
 SENSITIVITY_MOVE = 0.6  # joystick Y->forward multiplier
 
+# HUD
+TEXT_CACHE_SIZE = 32  # rendered text surfaces kept for reuse
+
 # 3D projection
 FOV = 90.0
 NEAR_PLANE = 0.1
@@ -81,16 +89,44 @@ def find_serial_port():
     print("No serial ports found!")
     return None
 
+# Fast path for the fixed {"x":NNN,"y":NNN} frame the Arduino sends
+JOY_RE = re.compile(rb'"x"\s*:\s*(-?\d+).*?"y"\s*:\s*(-?\d+)')
+
+def parse_joy_line(raw):
+    """Parse a raw joystick line (bytes) into (x, y), or None if it isn't one."""
+    if not raw.startswith(b"{"):
+        return None
+    m = JOY_RE.search(raw)
+    if m:
+        return int(m.group(1)), int(m.group(2))
+    # Fall back to a full JSON parse for anything the regex doesn't cover
+    try:
+        obj = json.loads(raw)
+    except ValueError:
+        return None
+    if isinstance(obj, dict) and 'x' in obj and 'y' in obj:
+        return int(obj['x']), int(obj['y'])
+    return None
+
 class SerialReader(threading.Thread):
     """Background thread to read serial data from Bluetooth."""
-    def __init__(self, port, baud, out_q):
+    def __init__(self, port, baud):
         super().__init__(daemon=True)
-        self.out_q = out_q
         self.port = port
         self.baud = baud
         self.running = True
         self.ser = None
         self.connected = False
+        # Only the newest joystick sample matters, so keep a single slot
+        # instead of a queue that can back up when the game falls behind
+        self._lock = threading.Lock()
+        self._latest_joy = None
+
+    def take_latest(self):
+        """Return the newest (x, y) joystick sample since the last call, or None."""
+        with self._lock:
+            joy, self._latest_joy = self._latest_joy, None
+        return joy
 
     def run(self):
         if not SERIAL_AVAILABLE or not self.port:
@@ -99,7 +135,7 @@ class SerialReader(threading.Thread):
         print(f"\nAttempting to connect to {self.port}...")
         
         try:
-            self.ser = serial.Serial(self.port, self.baud, timeout=0.1)
+            self.ser = serial.Serial(self.port, self.baud, timeout=0.05)
             self.connected = True
             print(f"✓ Connected to {self.port} at {self.baud} baud")
             print("Waiting for joystick data...\n")
@@ -111,36 +147,32 @@ class SerialReader(threading.Thread):
             print("  3. No other program is using the port")
             return
         
-        buffer = ""
+        pending = b""
         while self.running:
             try:
-                chunk = self.ser.read(256)
+                # Pull everything already buffered in one read (pyserial's
+                # readline() reads a byte at a time); the short timeout keeps
+                # stop() responsive when nothing is waiting
+                chunk = self.ser.read(max(1, self.ser.in_waiting))
                 if not chunk:
                     continue
                 
-                try:
-                    text = chunk.decode('utf-8', errors='ignore')
-                except Exception:
-                    text = str(chunk)
-                
-                buffer += text
-                
-                while "\n" in buffer:
-                    line, buffer = buffer.split("\n", 1)
-                    line = line.strip()
-                    if not line:
+                *lines, pending = (pending + chunk).split(b"\n")
+                for raw in lines:
+                    raw = raw.strip()
+                    if not raw:
                         continue
                     
-                    # Parse JSON joystick data
-                    try:
-                        obj = json.loads(line)
-                        if isinstance(obj, dict) and 'x' in obj and 'y' in obj:
-                            self.out_q.put(('joy', int(obj['x']), int(obj['y'])))
-                    except json.JSONDecodeError:
-                        # Not JSON, ignore or print for debugging
-                        if "===" in line or "Started" in line:
-                            print(f"Arduino: {line}")
-                        pass
+                    joy = parse_joy_line(raw)
+                    if joy is not None:
+                        with self._lock:
+                            self._latest_joy = joy
+                        continue
+                    
+                    # Not joystick data, ignore or print for debugging
+                    line = raw.decode('utf-8', errors='ignore')
+                    if "===" in line or "Started" in line:
+                        print(f"Arduino: {line}")
                         
             except Exception as e:
                 if self.running:
@@ -154,75 +186,209 @@ class SerialReader(threading.Thread):
     def stop(self):
         self.running = False
 
+# ---------- JIT Setup ----------
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except Exception:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Fallback no-op decorator when numba is not installed."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
+
 # ---------- 3D Math ----------
-def rotate_point(px, py, pz, yaw_deg, pitch_deg=0, roll_deg=0):
-    """Rotate point by yaw, pitch, roll (degrees) around origin."""
-    yaw = math.radians(yaw_deg)
-    pitch = math.radians(pitch_deg)
-    roll = math.radians(roll_deg)
-
-    # Yaw (around Y)
-    x1 = px * math.cos(yaw) - pz * math.sin(yaw)
-    z1 = px * math.sin(yaw) + pz * math.cos(yaw)
-    y1 = py
-
-    # Pitch (around X)
-    y2 = y1 * math.cos(pitch) - z1 * math.sin(pitch)
-    z2 = y1 * math.sin(pitch) + z1 * math.cos(pitch)
-    x2 = x1
-
-    # Roll (around Z)
-    x3 = x2 * math.cos(roll) - y2 * math.sin(roll)
-    y3 = x2 * math.sin(roll) + y2 * math.cos(roll)
-    z3 = z2
-
-    return x3, y3, z3
-
-def project_point(px, py, pz, cam_pos, cam_yaw, screen_w, screen_h):
-    """Transform world coordinates to screen coordinates."""
-    # Translate relative to camera
-    rx = px - cam_pos[0]
-    ry = py - cam_pos[1]
-    rz = pz - cam_pos[2]
-    
-    # Rotate by -cam_yaw
-    x_cam, y_cam, z_cam = rotate_point(rx, ry, rz, -cam_yaw, 0, 0)
-    
-    # Perspective projection
-    if z_cam <= 0.01:  # behind camera
-        return None
-    
+def warmup_jit():
+    """Compile project_batch up front so the first frame doesn't stall."""
+    if not NUMBA_AVAILABLE:
+        return
+    project_points(GRID_POINTS, (0.0, 0.0, 0.0), 1.0, 0.0, SCREEN_W, SCREEN_H)
+
+def yaw_matrix(cos_y, sin_y):
+    """3x3 rotation about the Y axis from a precomputed cos/sin.
+
+    Apply to row vectors as `pts @ yaw_matrix(c, s).T`.
+    """
+    return np.array([[cos_y, 0.0, -sin_y],
+                     [0.0, 1.0, 0.0],
+                     [sin_y, 0.0, cos_y]])
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def project_batch(pts, cam_x, cam_y, cam_z, cos_y, sin_y, f, screen_w, screen_h, out_xy, out_cam):
+    """Project an (N,3) array of world points, writing into out_xy (N,2) and out_cam (N,3)."""
+    half_w = screen_w / 2
+    half_h = screen_h / 2
+    for i in range(pts.shape[0]):
+        rx = pts[i, 0] - cam_x
+        ry = pts[i, 1] - cam_y
+        rz = pts[i, 2] - cam_z
+        x_cam = rx * cos_y - rz * sin_y
+        z_cam = rx * sin_y + rz * cos_y
+        out_cam[i, 0] = x_cam
+        out_cam[i, 1] = ry
+        out_cam[i, 2] = z_cam
+        if z_cam > 0.01:
+            out_xy[i, 0] = int((x_cam * f) / z_cam + half_w)
+            out_xy[i, 1] = int((-ry * f) / z_cam + half_h)
+        else:
+            out_xy[i, 0] = 0
+            out_xy[i, 1] = 0
+
+def project_points(pts, cam_pos, cos_y, sin_y, screen_w, screen_h):
+    """Project an (N,3) array of world coordinates to the screen.
+
+    cos_y/sin_y are the cosine and sine of -cam_yaw, computed once per frame.
+    Returns (xy, cam): xy is an (N,2) int array of screen coordinates and cam
+    the (N,3) camera-space coordinates, so cam[:, 2] is the depth. Points
+    behind the camera have z <= 0.01 and their xy entries are meaningless;
+    callers must mask on z.
+    """
+    f = (screen_w / 2) / math.tan(math.radians(FOV / 2))
+    if NUMBA_AVAILABLE:
+        xy = np.empty((len(pts), 2), dtype=np.int64)
+        cam = np.empty((len(pts), 3))
+        project_batch(pts, cam_pos[0], cam_pos[1], cam_pos[2], cos_y, sin_y,
+                      f, screen_w, screen_h, xy, cam)
+        return xy, cam
+
+    cam_space = (pts - np.asarray(cam_pos, dtype=float)) @ yaw_matrix(cos_y, sin_y).T
+
+    z = cam_space[:, 2]
+    in_front = z > 0.01
+    safe_z = np.where(in_front, z, 1.0)
+
+    xy = np.empty((len(pts), 2), dtype=np.int64)
+    xy[:, 0] = (cam_space[:, 0] * f / safe_z + screen_w / 2).astype(int)
+    xy[:, 1] = (-cam_space[:, 1] * f / safe_z + screen_h / 2).astype(int)
+    return xy, cam_space
+
+def perspective(cam, screen_w, screen_h):
+    """Screen coordinates for camera-space points that are all in front of the near plane."""
     f = (screen_w / 2) / math.tan(math.radians(FOV / 2))
-    screen_x = (x_cam * f) / z_cam + screen_w / 2
-    screen_y = (-y_cam * f) / z_cam + screen_h / 2
-    return (int(screen_x), int(screen_y), z_cam)
+    xy = np.empty((len(cam), 2), dtype=np.int64)
+    xy[:, 0] = (cam[:, 0] * f / cam[:, 2] + screen_w / 2).astype(int)
+    xy[:, 1] = (-cam[:, 1] * f / cam[:, 2] + screen_h / 2).astype(int)
+    return xy
+
+def clip_polygon_near(poly):
+    """Clip a camera-space polygon ((N,3) array) to the z >= NEAR_PLANE side.
+
+    Edges that cross the near plane are cut where they meet it, so a face the
+    camera is partly inside keeps its visible part instead of disappearing.
+    Returns an (M,3) array, empty if the whole polygon is behind the plane.
+    """
+    out = []
+    n = len(poly)
+    for i in range(n):
+        a, b = poly[i], poly[(i + 1) % n]
+        a_in, b_in = a[2] >= NEAR_PLANE, b[2] >= NEAR_PLANE
+        if a_in:
+            out.append(a)
+        if a_in != b_in:
+            t = (NEAR_PLANE - a[2]) / (b[2] - a[2])
+            out.append(a + t * (b - a))
+    return np.array(out).reshape(-1, 3)
 
 # ---------- Cube Geometry ----------
-CUBE_VERTS = [
+# Contiguous (8,3) float32 so the per-frame model transform is one matmul
+CUBE_VERTS = np.array([
     (-1, -1, -1), (1, -1, -1), (1, 1, -1), (-1, 1, -1),
     (-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1),
-]
+], dtype=np.float32)
 
 CUBE_FACES = [
     (0,1,2,3), (4,5,6,7), (0,1,5,4),
     (2,3,7,6), (1,2,6,5), (0,3,7,4),
 ]
+CUBE_FACES_ARR = np.array(CUBE_FACES, dtype=np.int64)  # (6,4) for fancy indexing
 
 FACE_COLORS = [
     (150,150,160), (180,160,130), (120,170,190),
     (200,140,140), (160,200,140), (160,140,200)
 ]
 
+# ---------- Ground Grid ----------
+# Endpoints of the ground lines, laid out as [start0, end0, start1, end1, ...]
+GRID_POINTS = np.array([
+    (gx * 1.0, 0.0, z)
+    for gx in range(-50, 51, 2)
+    for z in (-50.0, 50.0)
+])
+
+# ---------- Game State ----------
+@dataclass
+class GameState:
+    """Copy of the state draw() needs, taken under Game.state_lock."""
+    cam_pos: tuple
+    cam_yaw: float
+    cube_angle: float
+    player_pos: tuple
+    player_yaw: float
+    forward: float
+    turn: float
+    last_joy_x: int
+    last_joy_y: int
+    bt_connected: bool
+
+class UpdateThread(threading.Thread):
+    """Background thread that steps Game.update() at a fixed rate.
+
+    pygame rendering and event handling have to stay on the main thread, so
+    the simulation is the part that moves off it.
+    """
+    def __init__(self, game, hz):
+        super().__init__(daemon=True)
+        self.game = game
+        self.period = 1.0 / hz
+        self.running = True
+
+    def run(self):
+        prev = time.perf_counter()
+        while self.running:
+            now = time.perf_counter()
+            dt = max(0.0, min(1/15, now - prev))
+            prev = now
+            
+            with self.game.state_lock:
+                self.game.update(dt)
+            
+            remaining = self.period - (time.perf_counter() - now)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def stop(self):
+        self.running = False
+
 # ---------- Main Game ----------
 class Game:
     def __init__(self):
+        warmup_jit()
         pygame.init()
         pygame.display.set_caption("Real Game 3D - Bluetooth Joystick Control")
-        self.screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
+        # SCALED goes through SDL's renderer, which is GPU accelerated where
+        # available; vsync then paces flip() to the display refresh rate
+        flags = pygame.SCALED | pygame.DOUBLEBUF
+        try:
+            self.screen = pygame.display.set_mode((SCREEN_W, SCREEN_H), flags, vsync=1)
+        except pygame.error:
+            self.screen = pygame.display.set_mode((SCREEN_W, SCREEN_H), flags)
         self.clock = pygame.time.Clock()
         self.font = pygame.font.SysFont("Consolas", 18)
         self.font_big = pygame.font.SysFont("Consolas", 24, bold=True)
 
+        # HUD text surfaces; the status line only ever has two values
+        self._text_cache = OrderedDict()
+        self._status_surfs = {
+            True: self.font_big.render("Bluetooth Connected", True, (100, 255, 100)),
+            False: self.font_big.render("Keyboard Mode", True, (255, 100, 100)),
+        }
+
+        # Guards everything below that the update thread writes
+        self.state_lock = threading.Lock()
+        self.update_thread = None
+
         # Camera and player
         self.cam_pos = [0.0, 0.0, -6.0]
         self.cam_yaw = 0.0
@@ -233,6 +399,14 @@ class Game:
         self.cube_pos = [0.0, 0.0, 8.0]
         self.cube_scale = 2.2
         self.cube_angle = 0.0
+        self._t0 = time.perf_counter()
+
+        # Projected ground grid, reused while the camera is still
+        self._grid_cache = None
+        self._grid_key = None
+
+        # Screen-space corners of every cube face, refilled in place each frame
+        self._face_xy = np.empty((len(CUBE_FACES), 4, 2), dtype=np.int64)
 
         # Input state
         self.forward = 0.0
@@ -241,13 +415,12 @@ class Game:
         self.last_joy_y = 512
 
         # Serial setup
-        self.q = queue.Queue()
         self.serial_thread = None
         self.serial_port = find_serial_port()
         self.bt_connected = False
         
         if self.serial_port and SERIAL_AVAILABLE:
-            self.serial_thread = SerialReader(self.serial_port, SERIAL_BAUD, self.q)
+            self.serial_thread = SerialReader(self.serial_port, SERIAL_BAUD)
             self.serial_thread.start()
             time.sleep(0.5)  # Give thread time to connect
             self.bt_connected = self.serial_thread.connected
@@ -260,49 +433,53 @@ class Game:
             print("  ESC - Quit\n")
 
     def handle_serial_messages(self):
-        """Process queued serial messages (joystick data)."""
-        while not self.q.empty():
-            msg = self.q.get_nowait()
-            if msg[0] == 'joy':
-                x_raw, y_raw = msg[1], msg[2]
-                self.last_joy_x = x_raw
-                self.last_joy_y = y_raw
-                
-                # Center around midpoint
-                x = x_raw - (ANALOG_MAX + ANALOG_MIN) / 2
-                y = y_raw - (ANALOG_MAX + ANALOG_MIN) / 2
-                
-                # Apply deadzone
-                if abs(x) < DEADZONE: x = 0
-                if abs(y) < DEADZONE: y = 0
-                
-                # Normalize to -1..1
-                x_norm = max(-1.0, min(1.0, x / ((ANALOG_MAX - ANALOG_MIN) / 2)))
-                y_norm = max(-1.0, min(1.0, y / ((ANALOG_MAX - ANALOG_MIN) / 2)))
-                
-                # Map to controls (Y inverted for forward/back)
-                self.forward = -y_norm * SENSITIVITY_MOVE
-                self.turn = x_norm * SENSITIVITY_ROT
-                
-                if not self.bt_connected:
-                    self.bt_connected = True
-                    print("✓ Receiving joystick data!\n")
+        """Apply the latest serial joystick sample, if a new one arrived."""
+        if not self.serial_thread:
+            return
+        joy = self.serial_thread.take_latest()
+        if joy is None:
+            return
+        
+        x_raw, y_raw = joy
+        self.last_joy_x = x_raw
+        self.last_joy_y = y_raw
+        
+        # Center around midpoint
+        x = x_raw - (ANALOG_MAX + ANALOG_MIN) / 2
+        y = y_raw - (ANALOG_MAX + ANALOG_MIN) / 2
+        
+        # Apply deadzone
+        if abs(x) < DEADZONE: x = 0
+        if abs(y) < DEADZONE: y = 0
+        
+        # Normalize to -1..1
+        x_norm = max(-1.0, min(1.0, x / ((ANALOG_MAX - ANALOG_MIN) / 2)))
+        y_norm = max(-1.0, min(1.0, y / ((ANALOG_MAX - ANALOG_MIN) / 2)))
+        
+        # Map to controls (Y inverted for forward/back)
+        self.forward = -y_norm * SENSITIVITY_MOVE
+        self.turn = x_norm * SENSITIVITY_ROT
+        
+        if not self.bt_connected:
+            self.bt_connected = True
+            print("✓ Receiving joystick data!\n")
 
-    def handle_input(self, dt):
+    def handle_input(self):
         """Handle keyboard input (fallback control)."""
         keys = pygame.key.get_pressed()
         
         # Only use keyboard if no joystick input
-        if not (self.forward or self.turn):
-            k_forward = 0.0
-            if keys[pygame.K_w]: k_forward += 1.0
-            if keys[pygame.K_s]: k_forward -= 1.0
-            self.forward = k_forward
-            
-            k_turn = 0.0
-            if keys[pygame.K_q]: k_turn += 1.0
-            if keys[pygame.K_e]: k_turn -= 1.0
-            self.turn = k_turn * (ROT_SPEED / 180.0)
+        with self.state_lock:
+            if not (self.forward or self.turn):
+                k_forward = 0.0
+                if keys[pygame.K_w]: k_forward += 1.0
+                if keys[pygame.K_s]: k_forward -= 1.0
+                self.forward = k_forward
+                
+                k_turn = 0.0
+                if keys[pygame.K_q]: k_turn += 1.0
+                if keys[pygame.K_e]: k_turn -= 1.0
+                self.turn = k_turn * (ROT_SPEED / 180.0)
         
         # Event handling
         for ev in pygame.event.get():
@@ -313,118 +490,174 @@ class Game:
                     self.running = False
                 if ev.key == pygame.K_SPACE:
                     # Dash forward
-                    yaw_rad = math.radians(self.player_yaw)
-                    self.player_pos[0] += math.sin(yaw_rad) * 2.0
-                    self.player_pos[2] += math.cos(yaw_rad) * 2.0
+                    with self.state_lock:
+                        yaw_rad = math.radians(self.player_yaw)
+                        self.player_pos[0] += math.sin(yaw_rad) * 2.0
+                        self.player_pos[2] += math.cos(yaw_rad) * 2.0
 
     def update(self, dt):
-        """Update game state."""
+        """Update game state. Called with state_lock held."""
         self.handle_serial_messages()
         
         # Update player rotation
         self.player_yaw += self.turn * ROT_SPEED * dt
+        yaw_rad = math.radians(self.player_yaw)
+        sin_yaw, cos_yaw = math.sin(yaw_rad), math.cos(yaw_rad)
         
         # Move forward in player direction
         if abs(self.forward) > 0.001:
-            yaw_rad = math.radians(self.player_yaw)
-            dx = math.sin(yaw_rad) * self.forward * FORWARD_SPEED * dt
-            dz = math.cos(yaw_rad) * self.forward * FORWARD_SPEED * dt
+            dx = sin_yaw * self.forward * FORWARD_SPEED * dt
+            dz = cos_yaw * self.forward * FORWARD_SPEED * dt
             self.player_pos[0] += dx
             self.player_pos[2] += dz
         
         # Camera follows player
         cam_distance = 8.0
         cam_height = 2.5
-        yaw_rad = math.radians(self.player_yaw)
-        self.cam_pos[0] = self.player_pos[0] - math.sin(yaw_rad) * cam_distance
-        self.cam_pos[2] = self.player_pos[2] - math.cos(yaw_rad) * cam_distance
+        self.cam_pos[0] = self.player_pos[0] - sin_yaw * cam_distance
+        self.cam_pos[2] = self.player_pos[2] - cos_yaw * cam_distance
         self.cam_pos[1] = self.player_pos[1] + cam_height
         self.cam_yaw = self.player_yaw
         
         # Rotate cube for effect
-        self.cube_angle = (time.time() * 25.0) % 360.0
-
-    def draw(self):
-        """Render the 3D scene."""
+        self.cube_angle = ((time.perf_counter() - self._t0) * 25.0) % 360.0
+
+    def snapshot(self):
+        """Copy the current state for rendering."""
+        with self.state_lock:
+            return GameState(
+                cam_pos=tuple(self.cam_pos),
+                cam_yaw=self.cam_yaw,
+                cube_angle=self.cube_angle,
+                player_pos=tuple(self.player_pos),
+                player_yaw=self.player_yaw,
+                forward=self.forward,
+                turn=self.turn,
+                last_joy_x=self.last_joy_x,
+                last_joy_y=self.last_joy_y,
+                bt_connected=self.bt_connected,
+            )
+
+    def render_text(self, font, text, color):
+        """font.render with a small LRU cache, since HUD text rarely changes."""
+        key = (font, text, color)
+        surf = self._text_cache.get(key)
+        if surf is not None:
+            self._text_cache.move_to_end(key)
+            return surf
+        surf = font.render(text, True, color)
+        self._text_cache[key] = surf
+        if len(self._text_cache) > TEXT_CACHE_SIZE:
+            self._text_cache.popitem(last=False)
+        return surf
+
+    def draw(self, state):
+        """Render the 3D scene from a GameState snapshot."""
         self.screen.fill((18, 18, 24))
         
-        # Draw ground grid
-        for gx in range(-50, 51, 2):
-            x1, z1 = gx * 1.0, -50.0
-            x2, z2 = gx * 1.0, 50.0
-            p1 = project_point(x1, 0.0, z1, self.cam_pos, self.cam_yaw, SCREEN_W, SCREEN_H)
-            p2 = project_point(x2, 0.0, z2, self.cam_pos, self.cam_yaw, SCREEN_W, SCREEN_H)
-            if p1 and p2:
-                pygame.draw.aaline(self.screen, (28,28,36), (p1[0],p1[1]), (p2[0],p2[1]))
+        # Camera and cube yaw only change once per frame
+        cam_yaw = math.radians(-state.cam_yaw)
+        cam_cos, cam_sin = math.cos(cam_yaw), math.sin(cam_yaw)
+        cube_yaw = math.radians(state.cube_angle)
+        cube_cos, cube_sin = math.cos(cube_yaw), math.sin(cube_yaw)
         
-        # Draw cube
-        verts_trans = []
-        for vx, vy, vz in CUBE_VERTS:
-            sx = vx * self.cube_scale
-            sy = vy * self.cube_scale
-            sz = vz * self.cube_scale
-            rx, ry, rz = rotate_point(sx, sy, sz, self.cube_angle, 0, 0)
-            wx = rx + self.cube_pos[0]
-            wy = ry + self.cube_pos[1]
-            wz = rz + self.cube_pos[2]
-            verts_trans.append((wx, wy, wz))
+        # Draw ground grid (only reprojected when the camera has moved)
+        grid_key = (round(state.cam_pos[0], 3), round(state.cam_pos[1], 3),
+                    round(state.cam_pos[2], 3), round(state.cam_yaw, 2))
+        if grid_key != self._grid_key:
+            grid_xy, grid_cam = project_points(GRID_POINTS, state.cam_pos, cam_cos, cam_sin, SCREEN_W, SCREEN_H)
+            starts, ends = grid_cam[0::2], grid_cam[1::2]
+            start_in = starts[:, 2] >= NEAR_PLANE
+            end_in = ends[:, 2] >= NEAR_PLANE
+            
+            # Lines with both ends in front of the camera project as-is
+            visible = start_in & end_in
+            self._grid_cache = list(zip(grid_xy[0::2][visible].tolist(),
+                                        grid_xy[1::2][visible].tolist()))
+            
+            # Lines crossing the near plane are cut where they meet it
+            crossing = start_in ^ end_in
+            if crossing.any():
+                a, b = starts[crossing], ends[crossing]
+                t = (NEAR_PLANE - a[:, 2]) / (b[:, 2] - a[:, 2])
+                clipped = a + t[:, None] * (b - a)
+                front = np.where(start_in[crossing][:, None], a, b)
+                self._grid_cache.extend(zip(perspective(front, SCREEN_W, SCREEN_H).tolist(),
+                                            perspective(clipped, SCREEN_W, SCREEN_H).tolist()))
+            self._grid_key = grid_key
+        for p1, p2 in self._grid_cache:
+            pygame.draw.aaline(self.screen, (28,28,36), p1, p2)
         
-        # Sort faces by depth
-        face_draws = []
-        for fi, face in enumerate(CUBE_FACES):
-            pts = [project_point(*verts_trans[idx], self.cam_pos, self.cam_yaw, SCREEN_W, SCREEN_H) 
-                   for idx in face]
-            if any(p is None for p in pts):
-                continue
-            avg_z = sum(p[2] for p in pts) / len(pts)
-            face_draws.append((avg_z, fi, pts))
+        # Draw cube (scale, spin about Y, then move into place)
+        scaled = CUBE_VERTS * self.cube_scale
+        verts_trans = scaled @ yaw_matrix(cube_cos, cube_sin).T + self.cube_pos
+        
+        # Painter's algorithm in camera space (farthest face first)
+        cube_xy, cube_cam = project_points(verts_trans, state.cam_pos, cam_cos, cam_sin, SCREEN_W, SCREEN_H)
+        face_cam = cube_cam[CUBE_FACES_ARR]  # (6,4,3) camera-space face corners
+        face_z = face_cam[:, :, 2]
+        centroids = face_cam.mean(axis=1)
+        np.take(cube_xy, CUBE_FACES_ARR, axis=0, out=self._face_xy)
+        face_in = face_z >= NEAR_PLANE
+        face_visible = face_in.all(axis=1)
+        face_partial = face_in.any(axis=1) & ~face_visible
+        order = np.argsort(-centroids[:, 2], kind="stable")
         
-        face_draws.sort(key=lambda x: -x[0])
+        # Back-face culling: the cube is convex, so a face's outward normal is
+        # its centroid minus the cube center, and it faces the camera (at the
+        # camera-space origin) when that normal points back toward it
+        normals = centroids - cube_cam.mean(axis=0)
+        front_facing = np.einsum("ij,ij->i", normals, -centroids) > 0
         
         # Draw faces
-        for _, fi, pts in face_draws:
-            poly = [(p[0], p[1]) for p in pts]
+        for fi in order:
+            if not front_facing[fi]:
+                continue
+            if face_visible[fi]:
+                poly = self._face_xy[fi]
+            elif face_partial[fi]:
+                clipped = clip_polygon_near(cube_cam[CUBE_FACES_ARR[fi]])
+                poly = perspective(clipped, SCREEN_W, SCREEN_H)
+            else:
+                continue
             color = FACE_COLORS[fi % len(FACE_COLORS)]
-            shade = 1.0 - (abs(pts[0][2]) / 50.0)
+            shade = 1.0 - (abs(face_z[fi, 0]) / 50.0)
             shade = max(0.4, min(1.0, shade))
             shaded = tuple(max(0, min(255, int(c * shade))) for c in color)
             pygame.draw.polygon(self.screen, shaded, poly)
             pygame.draw.polygon(self.screen, (0,0,0), poly, 2)
         
         # HUD
-        status_color = (100, 255, 100) if self.bt_connected else (255, 100, 100)
-        status_text = "Bluetooth Connected" if self.bt_connected else "Keyboard Mode"
-        self.screen.blit(self.font_big.render(status_text, True, status_color), (12, 12))
+        self.screen.blit(self._status_surfs[bool(state.bt_connected)], (12, 12))
         
-        pos_text = f"Pos: ({self.player_pos[0]:.1f}, {self.player_pos[1]:.1f}, {self.player_pos[2]:.1f})  Yaw: {self.player_yaw:.1f}°"
-        self.screen.blit(self.font.render(pos_text, True, (230,230,230)), (12, 42))
+        pos_text = f"Pos: ({state.player_pos[0]:.1f}, {state.player_pos[1]:.1f}, {state.player_pos[2]:.1f})  Yaw: {state.player_yaw:.1f}°"
+        self.screen.blit(self.render_text(self.font, pos_text, (230,230,230)), (12, 42))
         
-        input_text = f"Forward: {self.forward:.2f}  Turn: {self.turn:.2f}"
-        self.screen.blit(self.font.render(input_text, True, (200,200,200)), (12, 66))
+        input_text = f"Forward: {state.forward:.2f}  Turn: {state.turn:.2f}"
+        self.screen.blit(self.render_text(self.font, input_text, (200,200,200)), (12, 66))
         
-        if self.bt_connected:
-            joy_text = f"Joystick: X={self.last_joy_x}  Y={self.last_joy_y}"
-            self.screen.blit(self.font.render(joy_text, True, (150,200,255)), (12, 90))
+        if state.bt_connected:
+            joy_text = f"Joystick: X={state.last_joy_x}  Y={state.last_joy_y}"
+            self.screen.blit(self.render_text(self.font, joy_text, (150,200,255)), (12, 90))
         
         pygame.display.flip()
 
     def run(self):
         """Main game loop."""
         self.running = True
-        prev = time.time()
+        self.update_thread = UpdateThread(self, UPDATE_HZ)
+        self.update_thread.start()
         
         while self.running:
-            now = time.time()
-            dt = now - prev
-            prev = now
-            dt = max(0.0, min(1/15, dt))
-            
-            self.handle_input(dt)
-            self.update(dt)
-            self.draw()
+            self.handle_input()
+            self.draw(self.snapshot())
             
+            # Ceiling for when vsync is unavailable or silently ignored
+            # (software renderer); free when vsync is really pacing flip()
             self.clock.tick(FPS)
         
+        self.update_thread.stop()
+        self.update_thread.join()
         if self.serial_thread:
             self.serial_thread.stop()
         pygame.quit()